@@ -24,16 +24,13 @@ class DemandResponsiveController:
 
     def decide(self, intersection: IntersectionState, observation: DetectorObservation) -> ActuationDecision:
         phase = intersection.current_phase
-        total_queue = sum(observation.vehicles[lane] for lane in phase.lanes)
-        pedestrian_pressure = sum(observation.pedestrians[lane] for lane in phase.lanes)
-
-        if phase.must_extend:
-            return ActuationDecision(switch_phase=False)
-
-        if self.pedestrian_priority and pedestrian_pressure > 0:
-            return ActuationDecision(switch_phase=False)
-
-        if total_queue < self.vehicle_threshold and phase.can_extend:
-            return ActuationDecision(switch_phase=False)
-
-        return ActuationDecision(switch_phase=True)
+        lane_idx = observation.indices_for(intersection, phase)
+        total_queue = observation.vehicles[lane_idx].sum()
+        pedestrian_pressure = observation.pedestrians[lane_idx].sum()
+
+        switch = (
+            not phase.must_extend
+            and (pedestrian_pressure == 0 or not self.pedestrian_priority)
+            and (total_queue >= self.vehicle_threshold or not phase.can_extend)
+        )
+        return ActuationDecision(switch_phase=bool(switch))
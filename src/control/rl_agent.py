@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import Iterable, Tuple
 
+import numpy as np
 import torch
 import torch.nn as nn
 
@@ -13,6 +14,7 @@ from src.simulation.observation import DetectorObservation
 class SimplePolicyNet(nn.Module):
     def __init__(self, lanes: int, hidden: int = 32):
         super().__init__()
+        self.lanes = lanes
         self.net = nn.Sequential(
             nn.Linear(lanes * 2, hidden),
             nn.ReLU(),
@@ -26,14 +28,39 @@ class SimplePolicyNet(nn.Module):
 @dataclass
 class ReinforcementLearningAgent:
     model: SimplePolicyNet
+    _state: torch.Tensor = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.model.eval()
+        # Reused input row: [vehicles per lane, pedestrians per lane].
+        self._state = torch.zeros(1, 2 * self.model.lanes)
 
     def decide(self, intersection: IntersectionState, observation: DetectorObservation) -> Tuple[int, float]:
         # Example forward pass; training loop should be added for real experiments.
-        lanes = list(observation.vehicles.keys())
-        vehicle_tensor = torch.tensor([observation.vehicles[l] for l in lanes], dtype=torch.float32)
-        pedestrian_tensor = torch.tensor([observation.pedestrians[l] for l in lanes], dtype=torch.float32)
-        state = torch.cat([vehicle_tensor, pedestrian_tensor]).unsqueeze(0)
-        logits = self.model(state)
-        probabilities = torch.softmax(logits, dim=-1)
-        action = torch.argmax(probabilities, dim=-1).item()
-        return action, probabilities[0, action].item()
+        lanes = self.model.lanes
+        with torch.inference_mode():
+            self._state[0, :lanes].copy_(torch.from_numpy(observation.vehicles))
+            self._state[0, lanes:].copy_(torch.from_numpy(observation.pedestrians))
+            logits = self.model(self._state)
+            # softmax is monotone, so the action is the argmax of the raw logits.
+            action = int(torch.argmax(logits, dim=-1))
+            probability = torch.softmax(logits[0], dim=-1)[action].item()
+        return action, probability
+
+    def decide_batch(self, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score ``(N, 2 * lanes)`` stacked states in one forward pass.
+
+        Returns per-row actions and the probability of each chosen action.
+        """
+
+        with torch.inference_mode():
+            logits = self.model(torch.from_numpy(np.ascontiguousarray(states, dtype=np.float32)))
+            actions = torch.argmax(logits, dim=-1)
+            probabilities = torch.softmax(logits, dim=-1).gather(1, actions.unsqueeze(1)).squeeze(1)
+        return actions.numpy(), probabilities.numpy()
+
+
+def stack_observations(observations: Iterable[DetectorObservation]) -> np.ndarray:
+    """Stack observations into ``decide_batch`` rows of ``[vehicles, pedestrians]``."""
+
+    return np.stack([np.concatenate([obs.vehicles, obs.pedestrians]) for obs in observations]).astype(np.float32)
@@ -32,7 +32,7 @@ def main() -> None:
 
     print(f"Simulation complete for {layout.id} after {intersection.time} seconds")
     print(f"Final phase: {intersection.current_phase.name}")
-    avg_queue = sum(lane.queue for lane in intersection.lanes.values()) / len(intersection.lanes)
+    avg_queue = float(intersection.queues.mean())
     print(f"Average queue length: {avg_queue:.2f} vehicles")
 
 
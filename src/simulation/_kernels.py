@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:  # pragma: no cover - optional JIT compiler
+    from numba import njit
+except ModuleNotFoundError:  # pragma: no cover - run kernels as plain Python
+    def njit(*args, **kwargs):  # type: ignore
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def step_fused(
+    queues: np.ndarray,
+    pedestrians: np.ndarray,
+    phase_mask: np.ndarray,
+    phase_lane_idx: np.ndarray,
+    phase_ptr: np.ndarray,
+    min_green: np.ndarray,
+    max_green: np.ndarray,
+    elapsed: int,
+    phase_idx: int,
+    vehicle_threshold: int,
+    pedestrian_priority: bool,
+    saturation_flow: int,
+    arrivals: np.ndarray,
+    crossings: np.ndarray,
+):
+    """Advance one intersection by one second under demand-responsive control.
+
+    A single pass over the lanes applies ``arrivals``/``crossings`` (this
+    step's rows from ``draw_demand``), accumulates the active phase's
+    pressure from ``phase_mask[phase_idx]`` and clears one pedestrian per
+    lane. Only the served phase's lanes are revisited for discharge; they
+    are stored CSR-style as ``phase_lane_idx[phase_ptr[p]:phase_ptr[p + 1]]``.
+    Returns the new ``(phase_idx, elapsed)`` after the tick.
+    """
+
+    total_queue = 0
+    pedestrian_pressure = 0
+    active = phase_mask[phase_idx]
+    for lane in range(queues.shape[0]):
+        queue = queues[lane] + arrivals[lane]
+        waiting = pedestrians[lane] + crossings[lane]
+        if active[lane]:
+            total_queue += queue
+            pedestrian_pressure += waiting
+        queues[lane] = queue
+        pedestrians[lane] = waiting - 1 if waiting > 0 else 0
+
+    hold = (
+        elapsed < min_green[phase_idx]
+        or (pedestrian_priority and pedestrian_pressure > 0)
+        or (total_queue < vehicle_threshold and elapsed < max_green[phase_idx])
+    )
+    if not hold:
+        phase_idx = (phase_idx + 1) % min_green.shape[0]
+        elapsed = 0
+
+    for k in range(phase_ptr[phase_idx], phase_ptr[phase_idx + 1]):
+        lane = phase_lane_idx[k]
+        queues[lane] -= min(queues[lane], saturation_flow)
+
+    return phase_idx, elapsed + 1
+
+
+@njit(cache=True, nogil=True)
+def discharge(queues: np.ndarray, pedestrians: np.ndarray, served: np.ndarray, saturation_flow: int) -> None:
+    """Clear ``served`` lanes at saturation flow and one pedestrian per lane, in place.
+
+    Works on a whole network's concatenated lane arrays, so every
+    intersection is discharged in one call.
+    """
+
+    for k in range(served.shape[0]):
+        lane = served[k]
+        queues[lane] -= min(queues[lane], saturation_flow)
+    for lane in range(pedestrians.shape[0]):
+        if pedestrians[lane] > 0:
+            pedestrians[lane] -= 1
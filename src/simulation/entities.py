@@ -1,31 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List
+from dataclasses import InitVar, dataclass, field
+from typing import Dict, Iterator, List, Mapping
 
+import numpy as np
 
-@dataclass
+# Rows converted per block when iterating a history as snapshots.
+_ITER_BLOCK_ROWS = 1024
+
+
+@dataclass(slots=True)
 class LaneState:
+    """Initial counts for a lane; live counts are held by ``IntersectionState``."""
+
     id: str
     queue: int = 0
     pedestrians: int = 0
 
-    def add_vehicle(self, count: int) -> None:
-        self.queue = max(0, self.queue + count)
-
-    def clear_with_capacity(self, capacity: int) -> int:
-        cleared = min(self.queue, capacity)
-        self.queue -= cleared
-        return cleared
 
-
-@dataclass
+@dataclass(slots=True)
 class PhaseState:
     name: str
     lanes: List[str]
     min_green: int
     max_green: int
     elapsed: int = 0
+    # Positions of ``lanes`` in the owning intersection's lane arrays.
+    lane_idx: np.ndarray = field(init=False, repr=False, compare=False)
 
     def reset(self) -> None:
         self.elapsed = 0
@@ -42,14 +43,117 @@ class PhaseState:
         return self.elapsed < self.min_green
 
 
-@dataclass
+@dataclass(eq=False, slots=True)
+class IntersectionHistory:
+    """Columnar per-step log of the active phase and lane counts.
+
+    Rows live in preallocated arrays (``reserve`` sizes them up front) and
+    grow geometrically if more steps are recorded than reserved.
+    """
+
+    lane_ids: List[str]
+    phase_names: List[str]
+    size: int = field(default=0, init=False)
+    _time: np.ndarray = field(init=False, repr=False)
+    _phase: np.ndarray = field(init=False, repr=False)
+    _queues: np.ndarray = field(init=False, repr=False)
+    _pedestrians: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        n_lanes = len(self.lane_ids)
+        self._time = np.empty(0, dtype=np.int64)
+        self._phase = np.empty(0, dtype=np.int16)
+        self._queues = np.empty((0, n_lanes), dtype=np.int32)
+        self._pedestrians = np.empty((0, n_lanes), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= len(self._time):
+            return
+        for name in ("_time", "_phase", "_queues", "_pedestrians"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def append(self, time: int, phase_index: int, queues: np.ndarray, pedestrians: np.ndarray) -> None:
+        row = self.size
+        if row == len(self._time):
+            self.reserve(max(64, 2 * row))
+        self._time[row] = time
+        self._phase[row] = phase_index
+        self._queues[row] = queues
+        self._pedestrians[row] = pedestrians
+        self.size = row + 1
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._time[: self.size]
+
+    @property
+    def phase(self) -> np.ndarray:
+        return self._phase[: self.size]
+
+    @property
+    def queues(self) -> np.ndarray:
+        return self._queues[: self.size]
+
+    @property
+    def pedestrians(self) -> np.ndarray:
+        return self._pedestrians[: self.size]
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield recorded steps as ``{"time", "phase", "queues", "pedestrians"}`` snapshots."""
+
+        # Convert to Python objects a block of rows at a time so long runs stream.
+        size = self.size
+        for start in range(0, size, _ITER_BLOCK_ROWS):
+            rows = slice(start, min(start + _ITER_BLOCK_ROWS, size))
+            for time, phase, queues, pedestrians in zip(
+                self._time[rows].tolist(),
+                self._phase[rows].tolist(),
+                self._queues[rows].tolist(),
+                self._pedestrians[rows].tolist(),
+            ):
+                yield {
+                    "time": time,
+                    "phase": self.phase_names[phase],
+                    "queues": dict(zip(self.lane_ids, queues)),
+                    "pedestrians": dict(zip(self.lane_ids, pedestrians)),
+                }
+
+
+@dataclass(slots=True)
 class IntersectionState:
+    """Signalized intersection with lane counts stored as contiguous arrays.
+
+    ``lanes`` only seeds the initial counts; afterwards ``queues`` and
+    ``pedestrians`` (aligned with ``lane_ids``) are the source of truth.
+    """
+
     layout_id: str
     phases: List[PhaseState]
-    lanes: Dict[str, LaneState]
+    lanes: InitVar[Mapping[str, LaneState]]
     current_phase_index: int = 0
     time: int = 0
-    history: List[dict] = field(default_factory=list)
+    history: IntersectionHistory = field(init=False)
+    lane_ids: List[str] = field(init=False)
+    lane_index: Dict[str, int] = field(init=False)
+    queues: np.ndarray = field(init=False)
+    pedestrians: np.ndarray = field(init=False)
+
+    def __post_init__(self, lanes: Mapping[str, LaneState]) -> None:
+        self.lane_ids = list(lanes)
+        self.lane_index = {lane_id: idx for idx, lane_id in enumerate(self.lane_ids)}
+        self.queues = np.array([lane.queue for lane in lanes.values()], dtype=np.int32)
+        self.pedestrians = np.array([lane.pedestrians for lane in lanes.values()], dtype=np.int32)
+        self.history = IntersectionHistory(
+            lane_ids=list(self.lane_ids), phase_names=[phase.name for phase in self.phases]
+        )
+        for phase in self.phases:
+            phase.lane_idx = np.array([self.lane_index[lane] for lane in phase.lanes], dtype=np.intp)
 
     @property
     def current_phase(self) -> PhaseState:
@@ -72,10 +176,4 @@ class IntersectionState:
         self.current_phase.tick()
 
     def record(self) -> None:
-        snapshot = {
-            "time": self.time,
-            "phase": self.current_phase.name,
-            "queues": {lane_id: lane.queue for lane_id, lane in self.lanes.items()},
-            "pedestrians": {lane_id: lane.pedestrians for lane_id, lane in self.lanes.items()},
-        }
-        self.history.append(snapshot)
+        self.history.append(self.time, self.current_phase_index, self.queues, self.pedestrians)
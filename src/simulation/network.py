@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Mapping
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
 
 from src.control.policy import ActuationDecision, DemandResponsiveController
+from src.simulation import _kernels
 from src.simulation.entities import IntersectionState
 from src.simulation.observation import DetectorObservation
 from src.simulation.simulator import (
-    apply_discharge,
     build_intersection,
     capture_observations,
-    simulate_arrivals,
-    simulate_pedestrians,
+    draw_demand,
 )
 from src.utils.config import LayoutConfig
 
@@ -22,6 +23,51 @@ class TrafficNetwork:
     offsets: Dict[str, int]
     time: int = 0
     history: List[dict] = field(default_factory=list)
+    # Network-wide integer code per lane id, and each intersection's lanes as codes.
+    lane_vocab: Dict[str, int] = field(init=False)
+    lane_codes: Dict[str, np.ndarray] = field(init=False)
+    # All intersections' lane counts back to back; each intersection's arrays are views.
+    queues: np.ndarray = field(init=False)
+    pedestrians: np.ndarray = field(init=False)
+    lane_start: Dict[str, int] = field(init=False)
+    # Intersection ids in network order, and their cycle offsets aligned with them.
+    intersection_ids: List[str] = field(init=False)
+    offset_array: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.intersection_ids = list(self.intersections)
+        self.offset_array = np.array(
+            [self.offsets.get(inter_id, 0) for inter_id in self.intersection_ids], dtype=np.int64
+        )
+        self.lane_vocab = {}
+        for intersection in self.intersections.values():
+            for lane_id in intersection.lane_ids:
+                self.lane_vocab.setdefault(lane_id, len(self.lane_vocab))
+        self.lane_codes = {
+            inter_id: np.array([self.lane_vocab[lane_id] for lane_id in inter.lane_ids], dtype=np.int16)
+            for inter_id, inter in self.intersections.items()
+        }
+
+        empty = [np.zeros(0, dtype=np.int32)]
+        self.queues = np.concatenate([inter.queues for inter in self.intersections.values()] + empty)
+        self.pedestrians = np.concatenate([inter.pedestrians for inter in self.intersections.values()] + empty)
+        self.lane_start = {}
+        start = 0
+        for inter_id, inter in self.intersections.items():
+            stop = start + inter.queues.size
+            inter.queues = self.queues[start:stop]
+            inter.pedestrians = self.pedestrians[start:stop]
+            self.lane_start[inter_id] = start
+            start = stop
+
+    def served_lanes(self) -> np.ndarray:
+        """Network-wide positions of the lanes each intersection currently serves."""
+
+        served = [
+            self.lane_start[inter_id] + inter.current_phase.lane_idx
+            for inter_id, inter in self.intersections.items()
+        ]
+        return np.concatenate(served + [np.zeros(0, dtype=np.intp)])
 
     def record(self) -> None:
         snapshot = {
@@ -29,7 +75,7 @@ class TrafficNetwork:
             "intersections": {
                 inter_id: {
                     "phase": inter.current_phase.name,
-                    "queues": {lane: lane_state.queue for lane, lane_state in inter.lanes.items()},
+                    "queues": dict(zip(inter.lane_ids, inter.queues.tolist())),
                 }
                 for inter_id, inter in self.intersections.items()
             },
@@ -37,8 +83,13 @@ class TrafficNetwork:
         self.history.append(snapshot)
 
 
-def build_network(layouts: Iterable[LayoutConfig], offsets: Mapping[str, int] | None = None) -> TrafficNetwork:
-    intersections = {layout.id: build_intersection(layout) for layout in layouts}
+def build_network(
+    layouts: Iterable[LayoutConfig],
+    offsets: Mapping[str, int] | None = None,
+    steps: int = 0,
+) -> TrafficNetwork:
+    layouts = list(layouts)
+    intersections = {layout.id: build_intersection(layout, steps=steps) for layout in layouts}
     offset_map = {layout.id: 0 for layout in layouts}
     if offsets:
         offset_map.update(offsets)
@@ -58,51 +109,95 @@ class CoordinatedSignalManager:
         self.cycle_length = cycle_length
         self.green_band = green_band
         self.local_controllers: Dict[str, DemandResponsiveController] = {}
+        self._network: TrafficNetwork | None = None
+        self._corridor_mask = np.zeros(0, dtype=np.bool_)
+        self._corridor_phase_cache: Dict[str, Optional[str]] = {}
+
+    def _bind(self, network: TrafficNetwork) -> None:
+        """Rebuild the per-network lookups the first time a network is seen."""
+
+        if self._network is network:
+            return
+        mask = np.zeros(len(network.lane_vocab), dtype=np.bool_)
+        codes = [network.lane_vocab[lane] for lane in self.corridor_lanes if lane in network.lane_vocab]
+        mask[codes] = True
+        self._corridor_mask = mask
+        self._corridor_phase_cache.clear()
+        self._network = network
+
+    def corridor_mask(self, network: TrafficNetwork) -> np.ndarray:
+        """Boolean mask over ``network.lane_vocab`` codes marking corridor lanes."""
+
+        self._bind(network)
+        return self._corridor_mask
+
+    def _corridor_phase(self, intersection: IntersectionState, corridor_lanes: np.ndarray) -> str | None:
+        """First phase serving a corridor lane; ``corridor_lanes`` flags the intersection's lanes."""
 
-    def _corridor_phase(self, intersection: IntersectionState) -> str | None:
         for phase in intersection.phases:
-            if any(lane in self.corridor_lanes for lane in phase.lanes):
+            if corridor_lanes[phase.lane_idx].any():
                 return phase.name
         return None
 
-    def _within_green_band(self, network_time: int, offset: int) -> bool:
-        return ((network_time + offset) % self.cycle_length) < self.green_band
+    def _corridor_flags(
+        self,
+        network: TrafficNetwork,
+        mask: np.ndarray,
+        inter_id: str,
+        observation: DetectorObservation,
+    ) -> np.ndarray:
+        """Flag which entries of ``observation.vehicles`` belong to corridor lanes."""
+
+        intersection = network.intersections.get(inter_id)
+        if intersection is not None and observation.aligned_with(intersection):
+            return mask[network.lane_codes[inter_id]]
+        flags = np.zeros(len(observation.vehicles), dtype=np.bool_)
+        for lane, idx in observation.lane_index.items():
+            flags[idx] = lane in self.corridor_lanes
+        return flags
+
+    def green_band_mask(self, network: TrafficNetwork) -> np.ndarray:
+        """Per-intersection flags (in network order) for being inside the green band now."""
+
+        return ((network.time + network.offset_array) % self.cycle_length) < self.green_band
 
     def sync_and_decide(
         self,
         network: TrafficNetwork,
         observations: Mapping[str, DetectorObservation],
     ) -> Dict[str, ActuationDecision]:
-        corridor_pressure = sum(
-            obs.vehicles.get(lane, 0)
-            for obs in observations.values()
-            for lane in self.corridor_lanes
-        )
-        cross_pressure = sum(
-            count
-            for obs in observations.values()
-            for lane, count in obs.vehicles.items()
-            if lane not in self.corridor_lanes
+        mask = self.corridor_mask(network)
+        empty = [np.zeros(0, dtype=np.int32)]
+        vehicles = np.concatenate([obs.vehicles for obs in observations.values()] + empty)
+        corridor = np.concatenate(
+            [self._corridor_flags(network, mask, inter_id, obs) for inter_id, obs in observations.items()]
+            + [np.zeros(0, dtype=np.bool_)]
         )
+        corridor_pressure = vehicles[corridor].sum()
+        cross_pressure = vehicles[~corridor].sum()
 
         prioritize_corridor = corridor_pressure >= cross_pressure
-        decisions: Dict[str, ActuationDecision] = {}
+        in_band = self.green_band_mask(network).tolist()
+        results: List[ActuationDecision] = []
 
-        for inter_id, intersection in network.intersections.items():
-            obs = observations[inter_id]
-            controller = self.local_controllers.setdefault(inter_id, DemandResponsiveController())
-            target_phase = self._corridor_phase(intersection)
+        for inter_id, band in zip(network.intersection_ids, in_band):
+            intersection = network.intersections[inter_id]
+            if inter_id not in self._corridor_phase_cache:
+                self._corridor_phase_cache[inter_id] = self._corridor_phase(
+                    intersection, mask[network.lane_codes[inter_id]]
+                )
+            target_phase = self._corridor_phase_cache[inter_id]
 
-            if prioritize_corridor and target_phase:
-                if self._within_green_band(network.time, network.offsets.get(inter_id, 0)):
-                    if intersection.current_phase.name != target_phase:
-                        intersection.set_phase(target_phase)
-                    decisions[inter_id] = ActuationDecision(switch_phase=False)
-                    continue
+            if prioritize_corridor and target_phase and band:
+                if intersection.current_phase.name != target_phase:
+                    intersection.set_phase(target_phase)
+                results.append(ActuationDecision(switch_phase=False))
+                continue
 
-            decisions[inter_id] = controller.decide(intersection, obs)
+            controller = self.local_controllers.setdefault(inter_id, DemandResponsiveController())
+            results.append(controller.decide(intersection, observations[inter_id]))
 
-        return decisions
+        return dict(zip(network.intersection_ids, results))
 
 
 def run_network_simulation(
@@ -112,13 +207,33 @@ def run_network_simulation(
     arrival_intensity: float = 0.8,
     crossing_rate: float = 0.15,
     offsets: Mapping[str, int] | None = None,
+    seed: int | None = None,
+    rng: np.random.Generator | None = None,
+    saturation_flow: int = 5,
 ) -> TrafficNetwork:
-    network = build_network(layouts, offsets=offsets)
+    """Simulate a coordinated network; ``rng`` overrides the generator seeded from ``seed``.
 
-    for _ in range(steps):
-        for intersection in network.intersections.values():
-            simulate_arrivals(intersection.lanes.values(), intensity=arrival_intensity)
-            simulate_pedestrians(intersection.lanes.values(), crossing_rate=crossing_rate)
+    Each intersection's demand for the whole run is drawn up front from its
+    own child stream, so results do not depend on the order intersections
+    are visited.
+    """
+
+    steps = max(steps, 0)
+    network = build_network(layouts, offsets=offsets, steps=steps)
+    rng = rng or np.random.default_rng(seed)
+    streams = rng.spawn(len(network.intersections))
+    # (steps, total_lanes) demand in the same lane order as ``network.queues``.
+    demand = [
+        draw_demand(stream, steps, inter.queues.size, intensity=arrival_intensity, crossing_rate=crossing_rate)
+        for stream, inter in zip(streams, network.intersections.values())
+    ]
+    empty = [np.zeros((steps, 0), dtype=np.int32)]
+    arrivals = np.concatenate([a for a, _ in demand] + empty, axis=1)
+    crossings = np.concatenate([c for _, c in demand] + empty, axis=1)
+
+    for t in range(steps):
+        network.queues += arrivals[t]
+        network.pedestrians += crossings[t]
 
         observations = {
             inter_id: capture_observations(intersection)
@@ -130,8 +245,8 @@ def run_network_simulation(
             if decision.switch_phase:
                 network.intersections[inter_id].switch_phase()
 
+        _kernels.discharge(network.queues, network.pedestrians, network.served_lanes(), saturation_flow)
         for intersection in network.intersections.values():
-            apply_discharge(intersection)
             intersection.record()
             intersection.tick()
 
@@ -1,10 +1,61 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Mapping
 
+import numpy as np
 
-@dataclass
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from src.simulation.entities import IntersectionState, PhaseState
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class DetectorObservation:
-    vehicles: Dict[str, int]
-    pedestrians: Dict[str, int]
+    """Per-lane vehicle and pedestrian counts aligned with ``lane_index``.
+
+    Counts may also be given as mappings keyed by lane id; they are converted
+    to arrays once, in the mapping's key order. Arrays passed without a
+    ``lane_index`` are taken to follow the intersection's ``lane_ids`` order.
+    """
+
+    vehicles: np.ndarray
+    pedestrians: np.ndarray
+    lane_index: Mapping[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if isinstance(self.vehicles, Mapping):
+            lane_index: Dict[str, int] = dict(self.lane_index) or {
+                lane: idx for idx, lane in enumerate(self.vehicles)
+            }
+            object.__setattr__(self, "lane_index", lane_index)
+            object.__setattr__(self, "vehicles", _to_array(self.vehicles, lane_index))
+        if isinstance(self.pedestrians, Mapping):
+            object.__setattr__(self, "pedestrians", _to_array(self.pedestrians, self.lane_index))
+
+    def aligned_with(self, intersection: IntersectionState) -> bool:
+        """Whether the count arrays are laid out in ``intersection.lane_ids`` order."""
+
+        if self.lane_index is intersection.lane_index or self.lane_index == intersection.lane_index:
+            return True
+        if not self.lane_index:
+            if len(self.vehicles) != len(intersection.lane_ids):
+                raise ValueError(
+                    f"Observation has {len(self.vehicles)} lanes but intersection {intersection.layout_id} "
+                    f"has {len(intersection.lane_ids)}; pass lane_index to align them"
+                )
+            return True
+        return False
+
+    def indices_for(self, intersection: IntersectionState, phase: PhaseState) -> np.ndarray:
+        """Positions of ``phase.lanes`` in this observation's arrays."""
+
+        if self.aligned_with(intersection):
+            return phase.lane_idx
+        return np.array([self.lane_index[lane] for lane in phase.lanes], dtype=np.intp)
+
+
+def _to_array(counts: Mapping[str, int], lane_index: Mapping[str, int]) -> np.ndarray:
+    values = np.zeros(len(lane_index), dtype=np.int32)
+    for lane, count in counts.items():
+        values[lane_index[lane]] = count
+    return values
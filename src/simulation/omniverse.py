@@ -1,26 +1,79 @@
 from __future__ import annotations
 
+import heapq
+import io
 import json
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import BinaryIO, Dict, Iterable, Iterator
 
 from src.simulation.entities import IntersectionState
 
+try:  # pragma: no cover - optional fast serializer
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
 
-def synthesize_frames(intersections: Iterable[IntersectionState]) -> List[Dict]:
-    frames: List[Dict] = []
-    for intersection in intersections:
-        for sample in intersection.history:
-            frames.append(
-                {
-                    "time": sample["time"],
-                    "intersection": intersection.layout_id,
-                    "phase": sample["phase"],
-                    "queues": sample["queues"],
-                    "pedestrians": sample["pedestrians"],
-                }
-            )
-    return sorted(frames, key=lambda f: (f["time"], f["intersection"]))
+# Frames serialized per encoder call; bounds memory while amortizing call overhead.
+FRAME_BATCH_SIZE = 1024
+
+
+def _dumps(obj: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _write_frames(f: BinaryIO, frames: Iterator[Dict]) -> None:
+    first = True
+    while batch := list(islice(frames, FRAME_BATCH_SIZE)):
+        if not first:
+            f.write(b",")
+        # Strip the enclosing brackets so batches concatenate into one array.
+        f.write(_dumps(batch)[1:-1])
+        first = False
+
+
+def _intersection_frames(intersection: IntersectionState) -> Iterator[Dict]:
+    for sample in intersection.history:
+        yield {
+            "time": sample["time"],
+            "intersection": intersection.layout_id,
+            "phase": sample["phase"],
+            "queues": sample["queues"],
+            "pedestrians": sample["pedestrians"],
+        }
+
+
+def synthesize_frames(intersections: Iterable[IntersectionState]) -> Iterator[Dict]:
+    """Yield frames ordered by ``(time, intersection)``.
+
+    Each history is already time-ordered, so the streams are merged lazily
+    rather than collected and sorted.
+    """
+
+    return heapq.merge(
+        *(_intersection_frames(intersection) for intersection in intersections),
+        key=lambda f: (f["time"], f["intersection"]),
+    )
+
+
+def _write_document(f: BinaryIO, intersections: Iterable[IntersectionState], metadata: Dict | None) -> None:
+    metadata = metadata or {"simulator": "traffic_lights_optimization", "unit": "seconds"}
+    f.write(b'{"metadata":' + _dumps(metadata) + b',"frames":[')
+    _write_frames(f, synthesize_frames(intersections))
+    f.write(b"]}")
+
+
+def serialize_omniverse_synthetic_data(
+    intersections: Iterable[IntersectionState],
+    metadata: Dict | None = None,
+) -> bytes:
+    """Omniverse export document as JSON bytes, built in memory."""
+
+    buffer = io.BytesIO()
+    _write_document(buffer, intersections, metadata)
+    return buffer.getvalue()
 
 
 def export_omniverse_synthetic_data(
@@ -30,12 +83,7 @@ def export_omniverse_synthetic_data(
 ) -> Path:
     """Prepare synthetic sensor traces for Omniverse digital twins."""
 
-    frames = synthesize_frames(intersections)
-    payload = {
-        "metadata": metadata or {"simulator": "traffic_lights_optimization", "unit": "seconds"},
-        "frames": frames,
-    }
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    with output_path.open("wb") as f:
+        _write_document(f, intersections, metadata)
     return output_path
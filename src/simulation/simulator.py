@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import random
-from typing import Dict, Iterable, List
+import numpy as np
 
-from src.control.policy import ActuationDecision, PhaseController
+from src.control.policy import ActuationDecision, DemandResponsiveController, PhaseController
+from src.simulation import _kernels
 from src.simulation.entities import IntersectionState, LaneState, PhaseState
 from src.simulation.observation import DetectorObservation
 from src.utils.config import LayoutConfig
 
 
-def build_intersection(layout: LayoutConfig) -> IntersectionState:
+def build_intersection(layout: LayoutConfig, steps: int = 0) -> IntersectionState:
     lanes = {lane: LaneState(id=lane) for phase in layout.phases for lane in phase.lanes}
     phases = [
         PhaseState(
@@ -20,36 +20,131 @@ def build_intersection(layout: LayoutConfig) -> IntersectionState:
         )
         for phase in layout.phases
     ]
-    return IntersectionState(layout_id=layout.id, phases=phases, lanes=lanes)
+    intersection = IntersectionState(layout_id=layout.id, phases=phases, lanes=lanes)
+    intersection.history.reserve(steps)
+    return intersection
 
 
-def simulate_arrivals(lanes: Iterable[LaneState], intensity: float = 0.7) -> None:
-    for lane in lanes:
-        arrivals = max(0, int(random.gauss(mu=intensity * 3, sigma=1)))
-        lane.add_vehicle(arrivals)
+def _draw_arrivals(rng: np.random.Generator, shape: tuple[int, ...], intensity: float) -> np.ndarray:
+    arrivals = rng.normal(intensity * 3, 1.0, size=shape).astype(np.int32)
+    np.maximum(arrivals, 0, out=arrivals)
+    return arrivals
 
 
-def simulate_pedestrians(lanes: Iterable[LaneState], crossing_rate: float = 0.2) -> None:
-    for lane in lanes:
-        if random.random() < crossing_rate:
-            lane.pedestrians += 1
+def _draw_crossings(rng: np.random.Generator, shape: tuple[int, ...], crossing_rate: float) -> np.ndarray:
+    return (rng.random(shape) < crossing_rate).astype(np.int32)
 
 
-def capture_observations(intersection: IntersectionState) -> DetectorObservation:
-    vehicles = {lane_id: lane.queue for lane_id, lane in intersection.lanes.items()}
-    pedestrians = {lane_id: lane.pedestrians for lane_id, lane in intersection.lanes.items()}
-    return DetectorObservation(vehicles=vehicles, pedestrians=pedestrians)
+def draw_demand(
+    rng: np.random.Generator,
+    steps: int,
+    n_lanes: int,
+    intensity: float = 0.7,
+    crossing_rate: float = 0.2,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pre-sample per-step vehicle arrivals and pedestrian crossings as ``(steps, n_lanes)`` arrays.
+
+    A negative ``steps`` is treated as zero, i.e. an empty run.
+    """
+
+    shape = (max(steps, 0), n_lanes)
+    arrivals = _draw_arrivals(rng, shape, intensity)
+    return arrivals, _draw_crossings(rng, shape, crossing_rate)
 
 
-def apply_discharge(intersection: IntersectionState, saturation_flow: int = 5) -> Dict[str, int]:
-    phase = intersection.current_phase
-    discharged: Dict[str, int] = {}
-    for lane_id in phase.lanes:
-        lane = intersection.lanes[lane_id]
-        discharged[lane_id] = lane.clear_with_capacity(saturation_flow)
-    for lane in intersection.lanes.values():
-        lane.pedestrians = max(0, lane.pedestrians - 1)
-    return discharged
+def simulate_arrivals(
+    intersection: IntersectionState,
+    intensity: float = 0.7,
+    rng: np.random.Generator | None = None,
+) -> None:
+    """Add one step of vehicle arrivals to every lane, drawn like ``draw_demand``."""
+
+    rng = rng or np.random.default_rng()
+    intersection.queues += _draw_arrivals(rng, intersection.queues.shape, intensity)
+
+
+def simulate_pedestrians(
+    intersection: IntersectionState,
+    crossing_rate: float = 0.2,
+    rng: np.random.Generator | None = None,
+) -> None:
+    """Add one step of pedestrian crossings to every lane, drawn like ``draw_demand``."""
+
+    rng = rng or np.random.default_rng()
+    intersection.pedestrians += _draw_crossings(rng, intersection.pedestrians.shape, crossing_rate)
+
+
+def capture_observations(intersection: IntersectionState) -> DetectorObservation:
+    """Expose the live lane arrays as an observation.
+
+    The arrays are views, not copies: controllers must read them before the
+    intersection is advanced.
+    """
+
+    return DetectorObservation(
+        vehicles=intersection.queues,
+        pedestrians=intersection.pedestrians,
+        lane_index=intersection.lane_index,
+    )
+
+
+def apply_discharge(intersection: IntersectionState, saturation_flow: int = 5) -> np.ndarray:
+    """Serve the active phase and return vehicles cleared per lane of ``phase.lanes``."""
+
+    idx = intersection.current_phase.lane_idx
+    cleared = np.minimum(intersection.queues[idx], saturation_flow)
+    intersection.queues[idx] -= cleared
+    intersection.pedestrians -= 1
+    np.maximum(intersection.pedestrians, 0, out=intersection.pedestrians)
+    return cleared
+
+
+def _phase_table(intersection: IntersectionState) -> tuple[np.ndarray, np.ndarray]:
+    """Flatten per-phase lane indices into CSR ``(lane_idx, ptr)`` arrays for the kernels."""
+
+    lane_idx = np.concatenate([phase.lane_idx for phase in intersection.phases]).astype(np.intp)
+    ptr = np.zeros(len(intersection.phases) + 1, dtype=np.intp)
+    ptr[1:] = np.cumsum([len(phase.lane_idx) for phase in intersection.phases])
+    return lane_idx, ptr
+
+
+def _run_demand_responsive(
+    intersection: IntersectionState,
+    controller: DemandResponsiveController,
+    arrivals: np.ndarray,
+    crossings: np.ndarray,
+    saturation_flow: int = 5,
+) -> None:
+    lane_idx, ptr = _phase_table(intersection)
+    phase_mask = np.zeros((len(intersection.phases), intersection.queues.size), dtype=np.bool_)
+    for row, phase in enumerate(intersection.phases):
+        phase_mask[row, phase.lane_idx] = True
+    min_green = np.array([phase.min_green for phase in intersection.phases], dtype=np.int64)
+    max_green = np.array([phase.max_green for phase in intersection.phases], dtype=np.int64)
+
+    phase_idx = intersection.current_phase_index
+    elapsed = intersection.current_phase.elapsed
+    for t in range(len(arrivals)):
+        phase_idx, elapsed = _kernels.step_fused(
+            intersection.queues,
+            intersection.pedestrians,
+            phase_mask,
+            lane_idx,
+            ptr,
+            min_green,
+            max_green,
+            elapsed,
+            phase_idx,
+            controller.vehicle_threshold,
+            controller.pedestrian_priority,
+            saturation_flow,
+            arrivals[t],
+            crossings[t],
+        )
+        intersection.current_phase_index = phase_idx
+        intersection.record()
+        intersection.time += 1
+    intersection.current_phase.elapsed = elapsed
 
 
 def run_simulation(
@@ -58,18 +153,44 @@ def run_simulation(
     steps: int = 120,
     arrival_intensity: float = 0.7,
     crossing_rate: float = 0.2,
+    seed: int | None = None,
+    rng: np.random.Generator | None = None,
 ) -> IntersectionState:
-    intersection = build_intersection(layout)
-    for _ in range(steps):
-        simulate_arrivals(intersection.lanes.values(), intensity=arrival_intensity)
-        simulate_pedestrians(intersection.lanes.values(), crossing_rate=crossing_rate)
-
-        observation = capture_observations(intersection)
-        decision: ActuationDecision = controller.decide(intersection, observation)
-        if decision.switch_phase:
-            intersection.switch_phase()
-
-        apply_discharge(intersection)
+    """Simulate one intersection; ``rng`` overrides the generator seeded from ``seed``."""
+
+    intersection = build_intersection(layout, steps=steps)
+    rng = rng or np.random.default_rng(seed)
+    arrivals, crossings = draw_demand(
+        rng, steps, intersection.queues.size, intensity=arrival_intensity, crossing_rate=crossing_rate
+    )
+    if type(controller) is DemandResponsiveController:
+        # Built-in controller: run the whole step in the compiled kernel.
+        _run_demand_responsive(intersection, controller, arrivals, crossings)
+        return intersection
+
+    # Counts changed since the controller last looked. A DemandResponsiveController
+    # (or subclass) decides from counts and phase state only, so while min-green
+    # holds and nothing moved its answer cannot change and the call is skipped.
+    # Other controllers may depend on time, so they are asked every step.
+    skip_idle = isinstance(controller, DemandResponsiveController)
+    dirty = True
+    for t in range(steps):
+        if arrivals[t].any() or crossings[t].any():
+            intersection.queues += arrivals[t]
+            intersection.pedestrians += crossings[t]
+            dirty = True
+
+        if dirty or not skip_idle or not intersection.current_phase.must_extend:
+            observation = capture_observations(intersection)
+            decision: ActuationDecision = controller.decide(intersection, observation)
+            dirty = False
+            if decision.switch_phase:
+                intersection.switch_phase()
+                dirty = True
+
+        had_pedestrians = intersection.pedestrians.any()
+        if apply_discharge(intersection).any() or had_pedestrians:
+            dirty = True
         intersection.record()
         intersection.tick()
 
@@ -1,57 +1,138 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Sequence
+from typing import Any, List, Mapping, Sequence
 
 try:  # pragma: no cover - optional dependency when loading YAML
     import yaml
 except ModuleNotFoundError:  # pragma: no cover - fallback when PyYAML is absent
     yaml = None
+    SafeLoader = None
+else:
+    try:  # pragma: no cover - libyaml bindings are optional
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # pragma: no cover - pure-Python parser
+        from yaml import SafeLoader
 
-try:  # pragma: no cover - optional dependency in constrained environments
-    from pydantic import BaseModel, Field
-except ModuleNotFoundError:  # pragma: no cover - lightweight stub
-    class BaseModel:  # type: ignore
-        def __init__(self, **kwargs):
-            for key, value in kwargs.items():
-                setattr(self, key, value)
+MIN_GREEN_FLOOR = 5
 
-    def Field(default=None, **_: object):  # type: ignore
-        return default
 
+def _require(raw: Mapping[str, Any], key: str, kind: str) -> Any:
+    try:
+        return raw[key]
+    except KeyError:
+        raise ValueError(f"{kind} is missing required field '{key}'") from None
+
+
+def _require_str(raw: Mapping[str, Any], key: str, kind: str) -> str:
+    value = _require(raw, key, kind)
+    if not isinstance(value, str):
+        raise ValueError(f"{kind} field '{key}' must be a string, got {type(value).__name__}")
+    return value
+
+
+def _require_int(raw: Mapping[str, Any], key: str, kind: str) -> int:
+    value = _require(raw, key, kind)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{kind} field '{key}' must be an integer, got {value!r}")
+    return value
+
+
+def _require_str_list(raw: Mapping[str, Any], key: str, kind: str) -> tuple:
+    value = _require(raw, key, kind)
+    if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{kind} field '{key}' must be a list of strings, got {value!r}")
+    return tuple(value)
 
-class PhaseConfig(BaseModel):
-    name: str
-    lanes: Sequence[str]
-    min_green: int = Field(ge=5)
-    max_green: int = Field(ge=5)
 
+def _require_mapping(raw: Any, kind: str) -> Mapping[str, Any]:
+    if not isinstance(raw, Mapping):
+        raise ValueError(f"{kind} must be a mapping, got {type(raw).__name__}")
+    return raw
 
-class CameraConfig(BaseModel):
+
+@dataclass(frozen=True, slots=True)
+class PhaseConfig:
+    name: str
+    lanes: Sequence[str]
+    min_green: int
+    max_green: int
+
+    def __post_init__(self) -> None:
+        if self.min_green < MIN_GREEN_FLOOR or self.max_green < MIN_GREEN_FLOOR:
+            raise ValueError(f"Phase {self.name} green times must be at least {MIN_GREEN_FLOOR} seconds")
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> PhaseConfig:
+        raw = _require_mapping(raw, "Phase")
+        return cls(
+            name=_require_str(raw, "name", "Phase"),
+            lanes=_require_str_list(raw, "lanes", "Phase"),
+            min_green=_require_int(raw, "min_green", "Phase"),
+            max_green=_require_int(raw, "max_green", "Phase"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CameraConfig:
     id: str
     lanes: Sequence[str]
     model_path: str
 
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> CameraConfig:
+        """Build from a sensor entry; keys other than the fields above are ignored."""
+
+        raw = _require_mapping(raw, "Camera")
+        return cls(
+            id=_require_str(raw, "id", "Camera"),
+            lanes=_require_str_list(raw, "lanes", "Camera"),
+            model_path=_require_str(raw, "model_path", "Camera"),
+        )
 
-class LoopDetectorConfig(BaseModel):
+
+@dataclass(frozen=True, slots=True)
+class LoopDetectorConfig:
     id: str
     lane: str
 
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> LoopDetectorConfig:
+        """Build from a sensor entry; keys other than the fields above are ignored."""
+
+        raw = _require_mapping(raw, "Loop detector")
+        return cls(id=_require_str(raw, "id", "Loop detector"), lane=_require_str(raw, "lane", "Loop detector"))
 
-class LayoutConfig(BaseModel):
+
+@dataclass(frozen=True, slots=True)
+class LayoutConfig:
     id: str
     phases: List[PhaseConfig]
     sensors: dict
 
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> LayoutConfig:
+        raw = _require_mapping(raw, "Layout")
+        phases = _require(raw, "phases", "Layout")
+        if not isinstance(phases, list):
+            raise ValueError(f"Layout field 'phases' must be a list, got {type(phases).__name__}")
+        sensors = _require(raw, "sensors", "Layout") or {}
+        return cls(
+            id=_require_str(raw, "id", "Layout"),
+            phases=[PhaseConfig.from_dict(item) for item in phases],
+            sensors=dict(_require_mapping(sensors, "Layout field 'sensors'")),
+        )
+
     @property
     def cameras(self) -> List[CameraConfig]:
         camera_data = self.sensors.get("cameras", [])
-        return [CameraConfig(**item) for item in camera_data]
+        return [CameraConfig.from_dict(item) for item in camera_data]
 
     @property
     def loop_detectors(self) -> List[LoopDetectorConfig]:
         loop_data = self.sensors.get("loop_detectors", [])
-        return [LoopDetectorConfig(**item) for item in loop_data]
+        return [LoopDetectorConfig.from_dict(item) for item in loop_data]
 
 
 def load_layout(path: Path | str) -> LayoutConfig:
@@ -59,15 +140,16 @@ def load_layout(path: Path | str) -> LayoutConfig:
     if yaml is None:
         raise ImportError("PyYAML is required to load layout files")
     with file_path.open("r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
-    return LayoutConfig(**raw)
+        raw = yaml.load(f, Loader=SafeLoader)
+    return LayoutConfig.from_dict(raw)
 
 
-class NetworkConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class NetworkConfig:
     id: str
     intersections: List[LayoutConfig]
-    offsets: dict = Field(default_factory=dict)
-    corridor_lanes: List[str] = Field(default_factory=list)
+    offsets: dict = field(default_factory=dict)
+    corridor_lanes: List[str] = field(default_factory=list)
 
 
 def load_network(path: Path | str) -> NetworkConfig:
@@ -75,8 +157,8 @@ def load_network(path: Path | str) -> NetworkConfig:
     if yaml is None:
         raise ImportError("PyYAML is required to load network files")
     with file_path.open("r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
-    intersections = [LayoutConfig(**item) for item in raw.get("intersections", [])]
+        raw = yaml.load(f, Loader=SafeLoader)
+    intersections = [LayoutConfig.from_dict(item) for item in raw.get("intersections", [])]
     return NetworkConfig(
         id=raw["id"],
         intersections=intersections,
@@ -1,27 +1,96 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import gzip
+import logging
 import os
 import secrets
-import statistics
+import threading
 import uuid
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import Depends, FastAPI, Form, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse
+import numpy as np
+from fastapi import Depends, FastAPI, Form, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel, Field
 from starlette.middleware.sessions import SessionMiddleware
 
 from src.control.policy import DemandResponsiveController
-from src.simulation.omniverse import export_omniverse_synthetic_data
+from src.simulation.entities import IntersectionHistory
+from src.simulation.omniverse import serialize_omniverse_synthetic_data
 from src.simulation.simulator import run_simulation
 from src.utils.config import LayoutConfig, load_layout
 
+try:  # pragma: no cover - optional fast serializer
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
 DEFAULT_CONFIG_DIR = BASE_DIR.parent.parent / "configs"
+DEFAULT_SEED = 0
+
+MAX_BATCH_SCENARIOS = 100
+# Upper bound on gzipped Omniverse exports kept in memory; least recently used go first.
+EXPORT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Simulations and exports are CPU/disk bound; run them off the event loop.
+_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+class SimRequest(BaseModel):
+    layout: str
+    steps: int = Field(120, ge=0)
+    arrival_intensity: float = 0.7
+    crossing_rate: float = 0.2
+    seed: int = DEFAULT_SEED
+
+
+class BatchSimRequest(BaseModel):
+    scenarios: List[SimRequest] = Field(min_length=1, max_length=MAX_BATCH_SCENARIOS)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header allows gzip, honouring ``q`` weights."""
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    if "gzip" in weights:
+        return weights["gzip"] > 0
+    return weights.get("*", 0.0) > 0
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response encoded by orjson (numpy-aware), skipping FastAPI's encoder pass."""
+
+    def render(self, content: object) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
 
 
 @dataclass
@@ -31,56 +100,125 @@ class SimulationRun:
     steps: int
     arrival_intensity: float
     crossing_rate: float
+    seed: int
     created_at: datetime
     metrics: Dict[str, float]
-    history: List[dict] = field(default_factory=list)
+    history: Optional[IntersectionHistory] = None
     omniverse_path: Optional[Path] = None
 
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-ready summary; the per-step trace is served by the Omniverse export."""
+
+        return {
+            "id": self.id,
+            "layout": self.layout,
+            "steps": self.steps,
+            "arrival_intensity": self.arrival_intensity,
+            "crossing_rate": self.crossing_rate,
+            "seed": self.seed,
+            "created_at": self.created_at.isoformat(),
+            "metrics": self.metrics,
+            "omniverse_path": str(self.omniverse_path) if self.omniverse_path else None,
+        }
+
 
 class SimulationStore:
-    def __init__(self, config_dir: Path = DEFAULT_CONFIG_DIR) -> None:
+    def __init__(self, config_dir: Path = DEFAULT_CONFIG_DIR, export_dir: Path | None = None) -> None:
         self.config_dir = config_dir
+        self.export_dir = export_dir or BASE_DIR.parent.parent / "artifacts"
         self.runs: Dict[str, SimulationRun] = {}
-        self.layout_index = self._discover_layouts()
-
-    def _discover_layouts(self) -> Dict[str, Path]:
-        layouts: Dict[str, Path] = {}
-        for path in self.config_dir.glob("*.yaml"):
+        # Parsed layouts by id, plus the (path, mtime) each was parsed from.
+        self.layouts: Dict[str, LayoutConfig] = {}
+        self._layout_files: Dict[str, Tuple[Path, float]] = {}
+        # Identical launches are deterministic given the seed, so reuse the first run.
+        self._run_cache: Dict[tuple, str] = {}
+        # Runs execute on worker threads; guards the layout index and run bookkeeping.
+        self._lock = threading.RLock()
+        # Runs are immutable, so each export is serialized and compressed once.
+        self.exports: "OrderedDict[str, bytes]" = OrderedDict()
+        self._exports_size = 0
+        self._exports_lock = threading.Lock()
+        # One lock per run so concurrent first downloads build its export only once.
+        self._export_build_locks: Dict[str, threading.Lock] = {}
+        self._discover_layouts()
+
+    def _discover_layouts(self) -> None:
+        for path in sorted(self.config_dir.glob("*.yaml")):
+            self._index_layout(path)
+
+    def _index_layout(self, path: Path) -> Optional[LayoutConfig]:
+        try:
+            mtime = os.path.getmtime(path)
             layout = load_layout(path)
-            layouts[layout.id] = path
-        return layouts
+        except OSError:
+            # Removed between listing and parsing.
+            return None
+        except (TypeError, ValueError):
+            # Not a single-intersection layout (e.g. a corridor network file).
+            return None
+        with self._lock:
+            self.layouts[layout.id] = layout
+            self._layout_files[layout.id] = (path, mtime)
+        return layout
+
+    def _refresh_layouts(self) -> None:
+        """Re-parse cached layouts whose file changed or vanished since it was indexed."""
+
+        with self._lock:
+            for layout_id, (path, mtime) in list(self._layout_files.items()):
+                try:
+                    if os.path.getmtime(path) == mtime:
+                        continue
+                except OSError:
+                    pass
+                self.layouts.pop(layout_id, None)
+                self._layout_files.pop(layout_id, None)
+                if path.exists():
+                    self._index_layout(path)
 
     def available_layouts(self) -> List[LayoutConfig]:
-        return [load_layout(path) for path in self.layout_index.values()]
-
-    def _ensure_layout(self, layout_id: str) -> Path:
-        if layout_id in self.layout_index:
-            return self.layout_index[layout_id]
-        candidate = self.config_dir / layout_id
-        if candidate.exists():
-            layout = load_layout(candidate)
-            self.layout_index[layout.id] = candidate
-            return candidate
-        raise HTTPException(status_code=404, detail=f"Layout {layout_id} not found")
+        with self._lock:
+            self._refresh_layouts()
+            return list(self.layouts.values())
+
+    def _ensure_layout(self, layout_id: str) -> Tuple[LayoutConfig, float]:
+        """Current layout for ``layout_id`` and the mtime of the file it was parsed from."""
+
+        with self._lock:
+            self._refresh_layouts()
+            if layout_id not in self.layouts:
+                candidate = self.config_dir / layout_id
+                layout = self._index_layout(candidate) if candidate.exists() else None
+                if layout is None:
+                    raise HTTPException(status_code=404, detail=f"Layout {layout_id} not found")
+                layout_id = layout.id
+            return self.layouts[layout_id], self._layout_files[layout_id][1]
 
     @staticmethod
-    def _summarize(history: List[dict]) -> Dict[str, float]:
-        if not history:
+    def _summarize(history: Optional[IntersectionHistory]) -> Dict[str, float]:
+        if not history or not history.queues.size:
             return {"avg_queue": 0.0, "max_queue": 0.0, "avg_pedestrians": 0.0}
-        queue_samples: List[int] = []
-        ped_samples: List[int] = []
-        for sample in history:
-            queue_samples.extend(sample.get("queues", {}).values())
-            ped_samples.extend(sample.get("pedestrians", {}).values())
         return {
-            "avg_queue": statistics.fmean(queue_samples) if queue_samples else 0.0,
-            "max_queue": max(queue_samples) if queue_samples else 0.0,
-            "avg_pedestrians": statistics.fmean(ped_samples) if ped_samples else 0.0,
+            "avg_queue": float(history.queues.mean()),
+            "max_queue": int(history.queues.max()),
+            "avg_pedestrians": float(history.pedestrians.mean()),
         }
 
-    def run(self, layout_id: str, steps: int, arrival_intensity: float, crossing_rate: float) -> SimulationRun:
-        layout_path = self._ensure_layout(layout_id)
-        layout = load_layout(layout_path)
+    def run(
+        self,
+        layout_id: str,
+        steps: int,
+        arrival_intensity: float,
+        crossing_rate: float,
+        seed: int = DEFAULT_SEED,
+    ) -> SimulationRun:
+        layout, mtime = self._ensure_layout(layout_id)
+        cache_key = (layout.id, mtime, steps, arrival_intensity, crossing_rate, seed)
+        with self._lock:
+            cached_id = self._run_cache.get(cache_key)
+            if cached_id in self.runs:
+                return self.runs[cached_id]
+
         controller = DemandResponsiveController()
         intersection = run_simulation(
             layout=layout,
@@ -88,6 +226,7 @@ class SimulationStore:
             steps=steps,
             arrival_intensity=arrival_intensity,
             crossing_rate=crossing_rate,
+            seed=seed,
         )
         metrics = self._summarize(intersection.history)
         run_id = uuid.uuid4().hex
@@ -97,58 +236,113 @@ class SimulationStore:
             steps=steps,
             arrival_intensity=arrival_intensity,
             crossing_rate=crossing_rate,
+            seed=seed,
             created_at=datetime.utcnow(),
             metrics=metrics,
             history=intersection.history,
         )
-        self.runs[run_id] = run
+        with self._lock:
+            # Another thread may have finished the same launch first; keep its run.
+            cached_id = self._run_cache.get(cache_key)
+            if cached_id in self.runs:
+                return self.runs[cached_id]
+            self.runs[run_id] = run
+            self._run_cache[cache_key] = run_id
         return run
 
     def analytics(self) -> Dict[str, float]:
-        if not self.runs:
+        with self._lock:
+            metrics = [run.metrics for run in self.runs.values()]
+        if not metrics:
             return {"runs": 0, "avg_queue": 0.0, "max_queue": 0.0, "avg_pedestrians": 0.0}
-        avg_queues = [run.metrics["avg_queue"] for run in self.runs.values()]
-        max_queues = [run.metrics["max_queue"] for run in self.runs.values()]
-        avg_peds = [run.metrics["avg_pedestrians"] for run in self.runs.values()]
+        count = len(metrics)
+        avg_queues = np.fromiter((m["avg_queue"] for m in metrics), dtype=np.float64, count=count)
+        max_queues = np.fromiter((m["max_queue"] for m in metrics), dtype=np.float64, count=count)
+        avg_peds = np.fromiter((m["avg_pedestrians"] for m in metrics), dtype=np.float64, count=count)
         return {
-            "runs": len(self.runs),
-            "avg_queue": statistics.fmean(avg_queues) if avg_queues else 0.0,
-            "max_queue": max(max_queues) if max_queues else 0.0,
-            "avg_pedestrians": statistics.fmean(avg_peds) if avg_peds else 0.0,
+            "runs": count,
+            "avg_queue": float(avg_queues.mean()),
+            "max_queue": float(max_queues.max()),
+            "avg_pedestrians": float(avg_peds.mean()),
         }
 
-    def export(self, run_id: str, output_dir: Path | None = None) -> Path:
+    def _save_export(self, run: SimulationRun, data: bytes) -> Optional[Path]:
+        """Best-effort atomic copy of the export on disk; readers never see a partial file."""
+
+        output_path = self.export_dir / f"{run.id}_omniverse.json"
+        tmp_path = output_path.with_name(f"{output_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.export_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, output_path)
+        except OSError:
+            logger.warning("Could not write Omniverse export to %s", output_path, exc_info=True)
+            return None
+        finally:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+        run.omniverse_path = output_path
+        return output_path
+
+    def export_gzip(self, run_id: str) -> bytes:
+        """Gzipped Omniverse export for ``run_id``, built on first request."""
+
         if run_id not in self.runs:
             raise HTTPException(status_code=404, detail="Run not found")
-        run = self.runs[run_id]
-        output_dir = output_dir or BASE_DIR.parent.parent / "artifacts"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{run_id}_omniverse.json"
-        run.omniverse_path = export_omniverse_synthetic_data(
-            intersections=[self._history_to_intersection(run)], output_path=output_path
-        )
-        return output_path
+        with self._exports_lock:
+            if run_id in self.exports:
+                self.exports.move_to_end(run_id)
+                return self.exports[run_id]
+            build_lock = self._export_build_locks.setdefault(run_id, threading.Lock())
+
+        with build_lock:
+            with self._exports_lock:
+                if run_id in self.exports:
+                    self.exports.move_to_end(run_id)
+                    return self.exports[run_id]
+            run = self.runs[run_id]
+            data = serialize_omniverse_synthetic_data([self._history_to_intersection(run)])
+            payload = gzip.compress(data, compresslevel=1, mtime=0)
+            with self._exports_lock:
+                self.exports[run_id] = payload
+                self._exports_size += len(payload)
+                while self._exports_size > EXPORT_CACHE_BYTES and len(self.exports) > 1:
+                    _, evicted = self.exports.popitem(last=False)
+                    self._exports_size -= len(evicted)
+                self._export_build_locks.pop(run_id, None)
+            # The on-disk copy is a side output; the response is served from ``payload``.
+            self._save_export(run, data)
+        return payload
 
     @staticmethod
     def _history_to_intersection(run: SimulationRun):
         from src.simulation.entities import IntersectionState, LaneState, PhaseState
 
-        lanes = {}
-        if run.history:
-            sample_queues = run.history[0].get("queues", {})
-            lanes = {lane_id: LaneState(id=lane_id, queue=0) for lane_id in sample_queues}
-        phases = [PhaseState(name="phase", lanes=list(lanes.keys()), min_green=5, max_green=5)]
+        history = run.history or IntersectionHistory(lane_ids=[], phase_names=[])
+        lanes = {lane_id: LaneState(id=lane_id) for lane_id in history.lane_ids}
+        phases = [PhaseState(name=name, lanes=[], min_green=5, max_green=5) for name in history.phase_names]
         intersection = IntersectionState(layout_id=run.layout, phases=phases, lanes=lanes)
-        intersection.history = run.history
+        intersection.history = history
         return intersection
 
 
-def create_app(config_dir: Path | None = None) -> FastAPI:
-    app = FastAPI(title="Traffic Light Simulation Portal", version="0.2.0")
+def create_app(config_dir: Path | None = None, export_dir: Path | None = None) -> FastAPI:
+    production = os.getenv("PORTAL_ENV") == "production"
+    app = FastAPI(
+        title="Traffic Light Simulation Portal",
+        version="0.2.0",
+        default_response_class=OrjsonResponse,
+        docs_url=None if production else "/docs",
+        redoc_url=None if production else "/redoc",
+    )
     templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
     app.add_middleware(SessionMiddleware, secret_key=os.getenv("PORTAL_SECRET", "change-me"))
 
-    store = SimulationStore(config_dir=config_dir or DEFAULT_CONFIG_DIR)
+    # Layouts are parsed once here; requests look them up in app.state.layouts.
+    store = SimulationStore(config_dir=config_dir or DEFAULT_CONFIG_DIR, export_dir=export_dir)
+    app.state.store = store
+    app.state.layouts = store.layouts
+    app.state.exports = store.exports
     users = {"admin": os.getenv("PORTAL_ADMIN_PASSWORD", "admin")}
 
     def require_user(request: Request) -> str:
@@ -198,21 +392,63 @@ def create_app(config_dir: Path | None = None) -> FastAPI:
     async def launch_simulation(
         user: str = Depends(require_user),
         layout: str = Form(...),
-        steps: int = Form(120),
+        steps: int = Form(120, ge=0),
         arrival_intensity: float = Form(0.7),
         crossing_rate: float = Form(0.2),
+        seed: int = Form(DEFAULT_SEED),
     ):
-        run = store.run(layout_id=layout, steps=steps, arrival_intensity=arrival_intensity, crossing_rate=crossing_rate)
-        return JSONResponse(run.__dict__)
+        run = await asyncio.get_running_loop().run_in_executor(
+            _POOL,
+            functools.partial(
+                store.run,
+                layout_id=layout,
+                steps=steps,
+                arrival_intensity=arrival_intensity,
+                crossing_rate=crossing_rate,
+                seed=seed,
+            ),
+        )
+        return OrjsonResponse(run.to_dict())
+
+    def run_scenario(scenario: SimRequest) -> Dict[str, object]:
+        try:
+            run = store.run(
+                layout_id=scenario.layout,
+                steps=scenario.steps,
+                arrival_intensity=scenario.arrival_intensity,
+                crossing_rate=scenario.crossing_rate,
+                seed=scenario.seed,
+            )
+        except HTTPException as exc:
+            return {"layout": scenario.layout, "error": exc.detail}
+        except Exception as exc:  # report per scenario instead of failing the batch
+            return {"layout": scenario.layout, "error": str(exc)}
+        return run.to_dict()
+
+    @app.post("/api/simulations/batch")
+    async def launch_simulation_batch(request: BatchSimRequest, user: str = Depends(require_user)):
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(_POOL, run_scenario, scenario) for scenario in request.scenarios)
+        )
+        return OrjsonResponse({"results": results})
 
     @app.get("/api/analytics")
     async def api_analytics(user: str = Depends(require_user)):
-        return store.analytics()
+        return OrjsonResponse(store.analytics())
 
     @app.get("/api/simulations/{run_id}/omniverse")
-    async def download_omniverse(run_id: str, user: str = Depends(require_user)):
-        path = store.export(run_id)
-        return FileResponse(path, media_type="application/json", filename=path.name)
+    async def download_omniverse(request: Request, run_id: str, user: str = Depends(require_user)):
+        body = await asyncio.get_running_loop().run_in_executor(_POOL, store.export_gzip, run_id)
+        headers = {
+            "content-disposition": f'attachment; filename="{run_id}_omniverse.json"',
+            "vary": "accept-encoding",
+        }
+        if accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["content-encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
+        return Response(body, media_type="application/json", headers=headers)
 
     @app.get("/health")
     async def healthcheck():
@@ -1,6 +1,23 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """One portal app per test session; tests clear its cookie jar before use."""
+
+    pytest.importorskip("fastapi")
+    pytest.importorskip("yaml")
+    from fastapi.testclient import TestClient
+
+    from src.web.app import create_app
+
+    app = create_app(config_dir=ROOT / "configs", export_dir=tmp_path_factory.mktemp("exports"))
+    with TestClient(app) as test_client:
+        yield test_client
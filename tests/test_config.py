@@ -0,0 +1,32 @@
+import pytest
+
+from src.utils.config import LayoutConfig, PhaseConfig
+
+
+def build_raw_layout(**phase_overrides) -> dict:
+    phase = {"name": "main", "lanes": ["N_S"], "min_green": 20, "max_green": 60, **phase_overrides}
+    return {
+        "id": "A",
+        "phases": [phase],
+        "sensors": {
+            "cameras": [{"id": "cam", "lanes": ["N_S"], "model_path": "m.engine", "fps": 30}],
+            "loop_detectors": [{"id": "loop", "lane": "N_S", "vendor": "x"}],
+        },
+    }
+
+
+def test_layout_from_dict_ignores_extra_sensor_keys():
+    layout = LayoutConfig.from_dict(build_raw_layout())
+
+    assert layout.phases == [PhaseConfig(name="main", lanes=("N_S",), min_green=20, max_green=60)]
+    assert layout.cameras[0].model_path == "m.engine"
+    assert layout.loop_detectors[0].lane == "N_S"
+
+
+@pytest.mark.parametrize(
+    "override",
+    [{"lanes": "N_S"}, {"name": None}, {"min_green": 20.9}, {"max_green": "60"}, {"min_green": 2}],
+)
+def test_layout_from_dict_rejects_malformed_phases(override):
+    with pytest.raises(ValueError):
+        LayoutConfig.from_dict(build_raw_layout(**override))
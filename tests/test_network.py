@@ -1,5 +1,8 @@
 import json
 
+import numpy as np
+
+from src.control.policy import ActuationDecision
 from src.simulation.network import (
     CoordinatedSignalManager,
     build_network,
@@ -57,3 +60,34 @@ def test_omniverse_export_contains_frames(tmp_path):
 
     assert data["frames"], "Expected synthetic frames in export"
     assert data["metadata"]["simulator"] == "traffic_lights_optimization"
+
+
+def test_corridor_sync_accepts_unindexed_arrays():
+    network = build_network([build_layout("A")])
+    coordinator = CoordinatedSignalManager(corridor_lanes=["N_S"], cycle_length=60, green_band=15)
+    network.intersections["A"].set_phase("side_street")
+
+    observations = {"A": DetectorObservation(vehicles=np.array([15, 0]), pedestrians=np.array([0, 0]))}
+    decisions = coordinator.sync_and_decide(network, observations)
+
+    assert network.intersections["A"].current_phase.name == "main_corridor"
+    assert decisions == {"A": ActuationDecision(switch_phase=False)}
+
+
+def test_empty_network_runs():
+    coordinator = CoordinatedSignalManager(corridor_lanes=["N_S"])
+
+    assert coordinator.sync_and_decide(build_network([]), {}) == {}
+    assert run_network_simulation(layouts=[], coordinator=coordinator, steps=3).time == 3
+
+
+def test_negative_steps_give_an_empty_network_run():
+    network = run_network_simulation(
+        layouts=[build_layout("A")],
+        coordinator=CoordinatedSignalManager(corridor_lanes=["N_S"]),
+        steps=-1,
+    )
+
+    assert network.time == 0
+    assert network.history == []
+    assert len(network.intersections["A"].history) == 0
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 from src.control.policy import ActuationDecision, DemandResponsiveController
 from src.simulation.entities import IntersectionState, LaneState, PhaseState
 from src.simulation.observation import DetectorObservation
@@ -26,3 +29,16 @@ def test_switch_when_threshold_reached():
 
     decision = controller.decide(intersection, obs)
     assert decision == ActuationDecision(switch_phase=True)
+
+
+def test_unindexed_arrays_follow_intersection_lane_order():
+    controller = DemandResponsiveController(vehicle_threshold=5)
+    intersection = build_intersection()
+    intersection.current_phase.elapsed = 6
+    obs = DetectorObservation(vehicles=np.array([12, 0]), pedestrians=np.array([0, 0]))
+
+    decision = controller.decide(intersection, obs)
+    assert decision == ActuationDecision(switch_phase=True)
+
+    with pytest.raises(ValueError):
+        controller.decide(intersection, DetectorObservation(vehicles=np.array([12]), pedestrians=np.array([0])))
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.control.rl_agent import ReinforcementLearningAgent, SimplePolicyNet, stack_observations
+from src.simulation.observation import DetectorObservation
+
+
+def build_agent() -> ReinforcementLearningAgent:
+    torch.manual_seed(0)
+    return ReinforcementLearningAgent(model=SimplePolicyNet(lanes=2))
+
+
+def eager_policy(agent: ReinforcementLearningAgent, states: np.ndarray) -> np.ndarray:
+    with torch.no_grad():
+        return torch.softmax(agent.model(torch.tensor(states, dtype=torch.float32)), dim=-1).numpy()
+
+
+def test_decide_matches_eager_softmax():
+    agent = build_agent()
+    obs = DetectorObservation(vehicles=np.array([12, 3]), pedestrians=np.array([0, 1]))
+
+    action, probability = agent.decide(None, obs)
+
+    expected = eager_policy(agent, np.array([[12, 3, 0, 1]]))[0]
+    assert action == int(expected.argmax())
+    assert probability == pytest.approx(float(expected.max()), rel=1e-6)
+
+
+def test_decide_batch_matches_decide_per_observation():
+    agent = build_agent()
+    observations = [
+        DetectorObservation(vehicles=np.array([12, 3]), pedestrians=np.array([0, 1])),
+        DetectorObservation(vehicles=np.array([0, 40]), pedestrians=np.array([5, 0])),
+    ]
+
+    actions, probabilities = agent.decide_batch(stack_observations(observations))
+
+    expected = eager_policy(agent, np.array([[12, 3, 0, 1], [0, 40, 5, 0]]))
+    np.testing.assert_array_equal(actions, expected.argmax(axis=1))
+    np.testing.assert_allclose(probabilities, expected.max(axis=1), rtol=1e-6)
+    for obs, action, probability in zip(observations, actions.tolist(), probabilities.tolist()):
+        assert agent.decide(None, obs) == (action, pytest.approx(probability, rel=1e-6))
@@ -0,0 +1,85 @@
+import numpy as np
+
+from src.control.policy import ActuationDecision, DemandResponsiveController
+from src.simulation.simulator import (
+    build_intersection,
+    draw_demand,
+    run_simulation,
+    simulate_arrivals,
+    simulate_pedestrians,
+)
+from src.utils.config import LayoutConfig, PhaseConfig
+
+
+class CountingController(DemandResponsiveController):
+    calls = 0
+
+    def decide(self, intersection, observation):
+        self.calls += 1
+        return super().decide(intersection, observation)
+
+
+def build_layout() -> LayoutConfig:
+    return LayoutConfig(
+        id="test",
+        phases=[
+            PhaseConfig(name="north_south", lanes=["N_S", "S_N"], min_green=5, max_green=20),
+            PhaseConfig(name="east_west", lanes=["E_W", "W_E"], min_green=5, max_green=20),
+        ],
+        sensors={},
+    )
+
+
+def test_kernel_matches_generic_controller_loop():
+    layout = build_layout()
+    compiled = run_simulation(layout, DemandResponsiveController(), steps=200, arrival_intensity=0.6, seed=7)
+    generic = run_simulation(layout, CountingController(), steps=200, arrival_intensity=0.6, seed=7)
+
+    assert list(compiled.history) == list(generic.history)
+    assert compiled.current_phase.name == generic.current_phase.name
+
+
+def test_idle_min_green_skips_decisions():
+    # A mean of -15 vehicles clips to zero arrivals on every lane-step.
+    controller = CountingController()
+    intersection = run_simulation(build_layout(), controller, steps=30, arrival_intensity=-5, crossing_rate=0.0)
+
+    assert len(intersection.history) == 30
+    assert not intersection.history.queues.any()
+    # Asked at t=0, then skipped while min-green holds after the start (t=1-4)
+    # and after the max-green switch at t=20 (t=22-24).
+    assert controller.calls == 23
+
+
+def test_other_controllers_are_asked_every_step():
+    class ElapsedController:
+        calls = 0
+
+        def decide(self, intersection, observation):
+            self.calls += 1
+            return ActuationDecision(switch_phase=intersection.current_phase.elapsed >= 2)
+
+    controller = ElapsedController()
+    intersection = run_simulation(build_layout(), controller, steps=10, arrival_intensity=-5, crossing_rate=0.0)
+
+    assert controller.calls == 10
+    assert [sample["phase"][0] for sample in intersection.history] == list("nneenneenn")
+
+
+def test_single_step_samplers_match_draw_demand():
+    intersection = build_intersection(build_layout())
+    rng = np.random.default_rng(3)
+    simulate_arrivals(intersection, intensity=0.9, rng=rng)
+    simulate_pedestrians(intersection, crossing_rate=0.5, rng=rng)
+
+    arrivals, crossings = draw_demand(np.random.default_rng(3), 1, 4, intensity=0.9, crossing_rate=0.5)
+    np.testing.assert_array_equal(intersection.queues, arrivals[0])
+    np.testing.assert_array_equal(intersection.pedestrians, crossings[0])
+
+
+def test_history_iterates_across_blocks():
+    intersection = run_simulation(build_layout(), DemandResponsiveController(), steps=2500, seed=2)
+    snapshots = list(intersection.history)
+
+    assert [sample["time"] for sample in snapshots] == list(range(2500))
+    assert snapshots[-1]["queues"] == dict(zip(intersection.lane_ids, intersection.history.queues[-1].tolist()))
@@ -5,35 +5,87 @@ pytest.importorskip("yaml")
 
 from pathlib import Path
 
-from fastapi.testclient import TestClient
 
-from src.web.app import create_app
-
-
-def test_portal_login_and_run_simulation(tmp_path):
-    app = create_app(config_dir=Path("configs"))
-    client = TestClient(app)
+def test_portal_login_and_run_simulation(client):
+    client.cookies.clear()
 
     unauthorized = client.get("/dashboard")
     assert unauthorized.status_code == 401
 
-    login = client.post("/login", data={"username": "admin", "password": "admin"}, allow_redirects=False)
+    login = client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
     assert login.status_code == 302
 
-    cookies = login.cookies
     response = client.post(
         "/api/simulations",
         data={"layout": "bukit_bintang_crossing", "steps": 20, "arrival_intensity": 0.5, "crossing_rate": 0.1},
-        cookies=cookies,
     )
     assert response.status_code == 200
     payload = response.json()
     assert payload["metrics"]["avg_queue"] >= 0
 
-    analytics = client.get("/api/analytics", cookies=cookies)
+    analytics = client.get("/api/analytics")
     assert analytics.status_code == 200
     assert analytics.json()["runs"] >= 1
 
-    export = client.get(f"/api/simulations/{payload['id']}/omniverse", cookies=cookies)
+    export = client.get(f"/api/simulations/{payload['id']}/omniverse")
     assert export.status_code == 200
     assert export.headers["content-type"].startswith("application/json")
+    assert export.headers["content-encoding"] == "gzip"
+    assert len(export.json()["frames"]) == 20
+
+    plain = client.get(f"/api/simulations/{payload['id']}/omniverse", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == export.json()
+
+    refused = client.get(f"/api/simulations/{payload['id']}/omniverse", headers={"accept-encoding": "gzip;q=0, br"})
+    assert "content-encoding" not in refused.headers
+    assert refused.json() == export.json()
+
+
+def test_batch_simulations_report_per_scenario_errors(client):
+    client.cookies.clear()
+    client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+
+    response = client.post(
+        "/api/simulations/batch",
+        json={
+            "scenarios": [
+                {"layout": "bukit_bintang_crossing", "steps": 10},
+                {"layout": "missing_layout", "steps": 10},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["metrics"]["avg_queue"] >= 0
+    assert "error" in results[1]
+
+    too_many = {"scenarios": [{"layout": "bukit_bintang_crossing"}] * 101}
+    assert client.post("/api/simulations/batch", json=too_many).status_code == 422
+
+
+def test_negative_steps_are_rejected(client):
+    client.cookies.clear()
+    client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+
+    launch = client.post("/api/simulations", data={"layout": "bukit_bintang_crossing", "steps": -1})
+    assert launch.status_code == 422
+
+    scenarios = [{"layout": "bukit_bintang_crossing", "steps": -1}]
+    assert client.post("/api/simulations/batch", json={"scenarios": scenarios}).status_code == 422
+
+
+def test_export_is_served_when_the_disk_copy_fails(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.web.app import create_app
+
+    blocked = tmp_path / "exports"
+    blocked.write_text("not a directory")
+    client = TestClient(create_app(config_dir=Path("configs"), export_dir=blocked))
+    client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+    run = client.post("/api/simulations", data={"layout": "bukit_bintang_crossing", "steps": 5}).json()
+
+    export = client.get(f"/api/simulations/{run['id']}/omniverse")
+    assert export.status_code == 200
+    assert len(export.json()["frames"]) == 5